@@ -0,0 +1,100 @@
+# cython: language_level=3
+"""
+Optional compiled title classifier for pageidmap.py
+
+Build in place with: cythonize -i _pageidmap_fast.pyx
+pageidmap.py falls back to its pure-Python classifier when this is not built.
+"""
+
+from cpython.unicode cimport PyUnicode_DecodeASCII
+
+
+cdef const char* _HEX = b"0123456789ABCDEF"
+
+# Bytes left as-is by urllib.parse.quote(title, safe='/')
+cdef unsigned char _SAFE[256]
+for _c in range(256):
+    _SAFE[_c] = (48 <= _c <= 57 or 65 <= _c <= 90 or 97 <= _c <= 122
+                 or _c in b"_.-~/")
+
+
+cdef int _classify(const unsigned char* p, Py_ssize_t n):
+    cdef Py_ssize_t i
+    cdef unsigned char c
+    cdef bint display = False
+
+    for i in range(n):
+        c = p[i]
+        # & / + %
+        if c == 38 or c == 47 or c == 43 or c == 37:
+            return 1
+        # ? \ ; # : and every byte of a non-ASCII sequence
+        if c == 63 or c == 92 or c == 59 or c == 35 or c == 58 or c >= 128:
+            display = True
+
+    if display:
+        return 2
+
+    # Trailing character that is not an ASCII letter or digit
+    if n:
+        c = p[n - 1]
+        if not (48 <= c <= 57 or 65 <= c <= 90 or 97 <= c <= 122):
+            return 2
+    return 0
+
+
+cdef str _percent_encode(const unsigned char* p, Py_ssize_t n, bint spaces_as_plus):
+    cdef bytearray buffer = bytearray(3 * n)
+    cdef unsigned char* out = buffer
+    cdef Py_ssize_t i
+    cdef Py_ssize_t j = 0
+    cdef unsigned char c
+
+    for i in range(n):
+        c = p[i]
+        if spaces_as_plus and c == 32:
+            # '+' itself is then percent-encoded, as in generate_display_url
+            c = 43
+        if _SAFE[c]:
+            out[j] = c
+            j += 1
+        else:
+            out[j] = 37
+            out[j + 1] = _HEX[c >> 4]
+            out[j + 2] = _HEX[c & 15]
+            j += 3
+    return PyUnicode_DecodeASCII(<char*>out, j, NULL)
+
+
+cpdef int classify(bytes title):
+    """
+    Classify a UTF-8 encoded title.
+
+    Returns 1 for search URL titles, 2 for display URL titles, 0 otherwise.
+    """
+    return _classify(title, len(title))
+
+
+def classify_and_format(list pages):
+    """
+    Return (page_id, url) for every (page_id, space_key, title) in pages that needs a URL.
+
+    Same result as calling process_page_data on each page.
+    """
+    cdef list result = []
+    cdef bytes data
+    cdef const unsigned char* p
+    cdef Py_ssize_t n
+    cdef int kind
+
+    for page_id, space_key, title in pages:
+        data = title.encode('utf-8')
+        p = data
+        n = len(data)
+        kind = _classify(p, n)
+        if kind == 1:
+            result.append((page_id, '/wiki/search?text=' + _percent_encode(p, n, False)))
+        elif kind == 2:
+            result.append((page_id, ''.join(('/wiki/display/', space_key, '/',
+                                             _percent_encode(p, n, True)))))
+    return result
@@ -10,98 +10,286 @@ Author: Robert Tulke, rt@debian.sh
 """
 
 import argparse
-import json
+import io
+import mmap
+import os
 import re
 import sys
-import configparser
-from typing import Optional, Tuple, Iterator, List, Dict, Any
-from urllib.parse import quote
+import copy
+from array import array
+from collections import deque
+from functools import lru_cache, partial
+from importlib.util import find_spec
+from itertools import accumulate, chain, islice
+from operator import itemgetter
+from typing import Optional, Tuple, Iterable, Iterator, List, Dict, Any, Callable, FrozenSet, TextIO, BinaryIO
+from urllib.parse import quote_from_bytes
 from pathlib import Path
-try:
-    import mysql.connector
-    from mysql.connector import Error as MySQLError
-    MYSQL_AVAILABLE = True
-except ImportError:
-    MYSQL_AVAILABLE = False
-    MySQLError = Exception
+
+
+def _module_available(name: str) -> bool:
+    """Check whether a module can be imported, without importing it."""
+    try:
+        return find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+class _DriverNotLoaded(Exception):
+    """Stands in for a database driver's error class until the driver is imported."""
+
+
+# Database drivers are slow to import, so they are only located here and
+# imported by _import_mysql/_import_postgresql when a connection is made
+MYSQL_AVAILABLE = _module_available('mysql.connector')
+POSTGRESQL_AVAILABLE = _module_available('psycopg2')
+MySQLError = _DriverNotLoaded
+PostgreSQLError = _DriverNotLoaded
+mysql_pooling = None
+pg_pooling = None
+
+# Required by --vectorized (checked in main); imported when the first batch is classified
+PYARROW_AVAILABLE = _module_available('pyarrow')
+# Used for JSON Lines output; imported when that format is written
+ORJSON_AVAILABLE = _module_available('orjson')
 
 try:
-    import psycopg2
-    from psycopg2 import Error as PostgreSQLError
-    POSTGRESQL_AVAILABLE = True
+    # Optional compiled classifier, built with: cythonize -i _pageidmap_fast.pyx
+    from _pageidmap_fast import classify as _fast_classify
+    from _pageidmap_fast import classify_and_format as _fast_classify_and_format
+    FAST_CLASSIFY_AVAILABLE = True
 except ImportError:
-    POSTGRESQL_AVAILABLE = False
-    PostgreSQLError = Exception
+    FAST_CLASSIFY_AVAILABLE = False
 
 
 # Compiled regex patterns for performance
 SEARCH_PATTERN = re.compile(r'[&/+%]')
 DISPLAY_PATTERN = re.compile(r'[?\\;#§:]|[^a-zA-Z0-9]$|[^\x00-\x7f]')
+# Titles matching either pattern, for --vectorized column scans
+_URL_TITLE_PATTERN = f"{SEARCH_PATTERN.pattern}|{DISPLAY_PATTERN.pattern}"
+# Bound once to skip the attribute lookup on every call
+_search_search = SEARCH_PATTERN.search
+_display_search = DISPLAY_PATTERN.search
+
+# Characters that force csv.writer to quote a field
+_csv_needs_quoting = re.compile(r'[,"\r\n]').search
+
+# Byte lookup table used by classify_title: 1 marks search characters,
+# 2 marks display characters (including every byte of a non-ASCII sequence)
+_SEARCH_BYTE = b'\x01'
+_DISPLAY_BYTE = b'\x02'
+_CLASS_NAMES = (None, 'search', 'display')
+_CLASSIFY_TABLE = bytes(
+    1 if c in b'&/+%' else 2 if c in b'?\\;#:' or c > 0x7f else 0
+    for c in range(256)
+)
+# Bytes that never make a title special (except as its last character)
+_PLAIN_TITLE_BYTES = b' 0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+# URL building blocks; '/' stays unescaped, matching quote()'s default
+_QUOTE_SAFE = '/'
+# Percent-encoded form of every byte value, indexed by byte
+_QUOTE_TABLE = [quote_from_bytes(bytes((c,)), _QUOTE_SAFE) for c in range(256)]
+_quote_byte = _QUOTE_TABLE.__getitem__
+_SEARCH_URL_PREFIX = '/wiki/search?text='
+_DISPLAY_URL_PREFIX = '/wiki/display/'
+
+# Constant parts of the generated rewrite rules
+_NGINX_RULE_PREFIX = "rewrite ^/pages/viewpage\\.action\\?pageId="
+_NGINX_RULE_SUFFIX = " permanent;"
+_APACHE_RULE_PREFIX = "RewriteRule ^pages/viewpage\\.action\\?pageId="
+_APACHE_RULE_SUFFIX = " [R=301,L]"
+
+# Encoded titles kept per URL format; repeated titles (templates, "Home",
+# meeting notes) skip the percent-encoding. A few thousand entries is < 1 MB.
+TITLE_CACHE_SIZE = 8192
+
+# SQL pre-filter for database sources: titles made only of ASCII letters,
+# digits and inner spaces never need special URL handling
+SQL_TITLE_PREFILTER = '[^A-Za-z0-9 ]|[^A-Za-z0-9]$'
+
+# Number of rows fetched per database round-trip
+DB_FETCH_SIZE = 10000
+
+# Row batches fetched ahead in a background thread while earlier rows are
+# processed, so database round-trips overlap with classification and output
+DB_PREFETCH_BATCHES = 2
+
+# Default database pool size; pooled connections are reused by later
+# queries in the same process instead of reconnecting
+DB_POOL_SIZE = 1
+# Settings that are not mysql-connector connection arguments
+_MYSQL_EXCLUDED_KEYS = ('db_type', 'ssl_enabled', 'pool_size')
+_mysql_pools: Dict[Tuple, Any] = {}
+_postgresql_pools: Dict[Tuple, Any] = {}
+
+# Input files are decoded and split in blocks of this many bytes
+FILE_BLOCK_SIZE = 1 << 20
+_LONE_CR = re.compile(rb'\r(?!\n)')
+
+# Number of pages sent to a worker process at a time with --workers
+PARALLEL_BATCH_SIZE = 10000
+
+# Pages handed to the compiled extension per call
+NATIVE_BATCH_SIZE = 10000
+
+# Write buffer for stdout output
+OUTPUT_BUFFER_SIZE = 1 << 20
+# Output lines joined into a single write() call
+OUTPUT_BATCH_LINES = 1024
+
+# Number of pages classified per batch with --vectorized
+VECTORIZED_BATCH_SIZE = 10000
 
 
 def has_special_search_chars(title: str) -> bool:
     """Check if title contains characters requiring search URL format."""
-    return bool(SEARCH_PATTERN.search(title))
+    return _search_search(title) is not None
 
 
 def has_display_chars(title: str) -> bool:
     """Check if title contains characters requiring display URL format."""
-    return bool(DISPLAY_PATTERN.search(title))
+    return _display_search(title) is not None
 
 
-def generate_search_url(page_id: str, title: str) -> str:
+def classify_title(title: str) -> Optional[str]:
+    """
+    Classify a title by the URL format it requires.
+    
+    Equivalent to SEARCH_PATTERN/DISPLAY_PATTERN, but a single translate
+    over the UTF-8 bytes (or the compiled extension, if built) replaces
+    the regex scans.
+    Returns 'search', 'display' or None.
+    """
+    data = title.encode('utf-8', 'surrogatepass')
+    if FAST_CLASSIFY_AVAILABLE:
+        return _CLASS_NAMES[_fast_classify(data)]
+    # Most titles are plain ASCII words: nothing is left once those bytes
+    # are deleted, and only a trailing space can still make them special
+    if not data.translate(None, _PLAIN_TITLE_BYTES):
+        return 'display' if data.endswith(b' ') else None
+    classes = data.translate(_CLASSIFY_TABLE)
+    if _SEARCH_BYTE in classes:
+        return 'search'
+    if _DISPLAY_BYTE in classes or (data and not data[-1:].isalnum()):
+        return 'display'
+    return None
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def _encoded_title(title: str) -> str:
+    """Percent-encode a title for search URLs."""
+    return ''.join(map(_quote_byte, title.encode('utf-8')))
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def _encoded_display_title(title: str) -> str:
+    """Percent-encode a title for display URLs (spaces become '+')."""
+    return ''.join(map(_quote_byte, title.replace(' ', '+').encode('utf-8')))
+
+
+def generate_search_url(title: str) -> str:
     """Generate search-based URL for problematic titles."""
-    return f"{page_id}\t/wiki/search?text={quote(title)}"
+    return _SEARCH_URL_PREFIX + _encoded_title(title)
 
 
-def generate_display_url(page_id: str, space_key: str, title: str) -> str:
+def generate_display_url(space_key: str, title: str) -> str:
     """Generate display-based URL for titles with special characters."""
-    processed_title = title.replace(' ', '+')
-    return f"{page_id}\t/wiki/display/{space_key}/{quote(processed_title)}"
+    return ''.join((_DISPLAY_URL_PREFIX, space_key, '/', _encoded_display_title(title)))
 
 
-def process_page_data(page_id: str, space_key: str, title: str) -> Optional[str]:
+def process_page_data(space_key: str, title: str) -> Optional[str]:
     """
-    Process a single page entry and return URL mapping if needed.
+    Process a single page entry and return its URL if needed.
     
-    Returns URL mapping string or None if no special handling needed.
+    Returns URL string or None if no special handling needed.
     """
-    if has_special_search_chars(title):
-        return generate_search_url(page_id, title)
-    elif has_display_chars(title):
-        return generate_display_url(page_id, space_key, title)
+    kind = classify_title(title)
+    if kind == 'search':
+        return generate_search_url(title)
+    elif kind == 'display':
+        return generate_display_url(space_key, title)
     return None
 
 
 def parse_line(line: str) -> Optional[Tuple[str, str, str]]:
     """Parse tab-separated line into page components."""
-    parts = line.strip().split('\t')
+    # Only the first three fields are used; the rest stays unsplit
+    parts = line.strip().split('\t', 3)
     if len(parts) < 3:
         return None
     
-    page_id = str(parts[0]).strip()
-    space_key = str(parts[1]).strip()
-    title = str(parts[2]).strip()
-    
-    return page_id, space_key, title
+    return parts[0].strip(), parts[1].strip(), parts[2].strip()
 
 
-def process_file_source(filename: str, silent: bool = False) -> Iterator[Tuple[str, str, str]]:
-    """Process file-based input source."""
+def iter_file_blocks(file: BinaryIO) -> Iterator[List[str]]:
+    """
+    Yield lists of decoded lines from a binary file, memory-mapping it when possible.
+    
+    The mapping is decoded in blocks that end on a newline and split in C.
+    Lines are yielded without their newline. Pipes, empty files and files
+    with bare carriage returns (which text mode treats as line breaks) are
+    read through a regular UTF-8 text wrapper instead.
+    """
     try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            for line_num, line in enumerate(file, 1):
-                if not line.strip():
-                    continue
-                
-                parsed = parse_line(line)
-                if not parsed:
-                    if not silent:
-                        print(f"Warning: Invalid line {line_num}: {line.strip()}", 
-                              file=sys.stderr)
-                    continue
-                
-                yield parsed
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        mapped = None
+    
+    if mapped is not None and mapped.find(b'\r') != -1 and _LONE_CR.search(mapped) is not None:
+        mapped.close()
+        mapped = None
+    
+    if mapped is None:
+        text = io.TextIOWrapper(file, encoding='utf-8')
+        yield from iter(lambda: text.readlines(FILE_BLOCK_SIZE), [])
+        return
+    
+    with mapped:
+        size = len(mapped)
+        # A final newline ends the last line rather than starting a new one
+        if mapped[size - 1:] == b'\n':
+            size -= 1
+        pos = 0
+        while pos <= size:
+            limit = pos + FILE_BLOCK_SIZE
+            if limit >= size:
+                end = size
+            else:
+                end = mapped.rfind(b'\n', pos, limit)
+                if end == -1:
+                    # Single line longer than a block
+                    end = mapped.find(b'\n', limit)
+                    if end == -1 or end > size:
+                        end = size
+            yield mapped[pos:end].decode('utf-8').split('\n')
+            pos = end + 1
+
+
+def process_file_source(filename: str, silent: bool = False,
+                        space_filter: Optional[FrozenSet[str]] = None) -> Iterator[Tuple[str, str, str]]:
+    """Process file-based input source, optionally keeping only pages of the given (upper-case) space keys."""
+    try:
+        with open(filename, 'rb') as file:
+            line_num = 0
+            for block in iter_file_blocks(file):
+                for line in block:
+                    line_num += 1
+                    # Same as "not line.strip()" without building a stripped copy
+                    if not line or line.isspace():
+                        continue
+                    
+                    parsed = parse_line(line)
+                    if not parsed:
+                        if not silent:
+                            print(f"Warning: Invalid line {line_num}: {line.strip()}", 
+                                  file=sys.stderr)
+                        continue
+                    
+                    if space_filter is not None and parsed[1].upper() not in space_filter:
+                        continue
+                    
+                    yield parsed
                 
     except FileNotFoundError:
         print(f"Error: Could not open file '{filename}'", file=sys.stderr)
@@ -165,6 +353,87 @@ def map_ssl_config(db_type: str, config: Dict[str, Any]) -> Dict[str, Any]:
                 if k.startswith('ssl_') or k in ['ssl_disabled']}
 
 
+def _import_mysql() -> None:
+    """Import mysql-connector on first use."""
+    global MySQLError, mysql_pooling
+    if mysql_pooling is None:
+        from mysql.connector import Error, pooling
+        MySQLError, mysql_pooling = Error, pooling
+
+
+def _import_postgresql() -> None:
+    """Import psycopg2 on first use."""
+    global PostgreSQLError, pg_pooling
+    if pg_pooling is None:
+        from psycopg2 import Error, pool
+        PostgreSQLError, pg_pooling = Error, pool
+
+
+def get_mysql_pool(config: Dict[str, Any]) -> Any:
+    """Return the MySQL/MariaDB connection pool for config, creating it on first use."""
+    pool_size = config.get('pool_size') or DB_POOL_SIZE
+    mysql_config = {k: v for k, v in config.items()
+                    if k not in _MYSQL_EXCLUDED_KEYS and v is not None}
+    
+    pool_key = tuple(sorted(mysql_config.items()))
+    pool = _mysql_pools.get(pool_key)
+    if pool is None:
+        # mysql-connector opens all pool connections up front
+        pool = mysql_pooling.MySQLConnectionPool(
+            pool_name=f"pageidmap{len(_mysql_pools) + 1}",
+            pool_size=pool_size,
+            **mysql_config
+        )
+        _mysql_pools[pool_key] = pool
+    return pool
+
+
+def get_postgresql_pool(config: Dict[str, Any]) -> Any:
+    """Return the PostgreSQL connection pool for config, creating it on first use."""
+    pool_size = config.get('pool_size') or DB_POOL_SIZE
+    
+    # Prepare PostgreSQL connection parameters
+    pg_config = {
+        'host': config['host'],
+        'port': config['port'],
+        'database': config['database'],
+        'user': config['user'],
+        'password': config['password']
+    }
+    
+    # Add SSL configuration
+    ssl_config = map_ssl_config('postgresql', config)
+    pg_config.update(ssl_config)
+    
+    # Remove None values
+    pg_config = {k: v for k, v in pg_config.items() if v is not None}
+    
+    pool_key = tuple(sorted(pg_config.items()))
+    pool = _postgresql_pools.get(pool_key)
+    if pool is None:
+        pool = pg_pooling.SimpleConnectionPool(1, pool_size, **pg_config)
+        _postgresql_pools[pool_key] = pool
+    return pool
+
+
+def close_db_pools() -> None:
+    """Close every pooled database connection so servers see a clean disconnect."""
+    for pool in _mysql_pools.values():
+        try:
+            # Closes idle connections with COM_QUIT; mysql-connector has no public API for this
+            pool._remove_connections()
+        except MySQLError:
+            pass
+    _mysql_pools.clear()
+    
+    for pool in _postgresql_pools.values():
+        try:
+            pool.closeall()
+        except PostgreSQLError:
+            pass
+    _postgresql_pools.clear()
+
+
 def create_db_connection(config: Dict[str, Any]) -> Any:
     """Create database connection with multi-database support."""
     db_type = config.get('db_type', 'mysql').lower()
@@ -173,25 +442,10 @@ def create_db_connection(config: Dict[str, Any]) -> Any:
         if not POSTGRESQL_AVAILABLE:
             print("Error: psycopg2 not available. Install with: pip install psycopg2-binary", file=sys.stderr)
             sys.exit(1)
+        _import_postgresql()
         
         try:
-            # Prepare PostgreSQL connection parameters
-            pg_config = {
-                'host': config['host'],
-                'port': config['port'],
-                'database': config['database'],
-                'user': config['user'],
-                'password': config['password']
-            }
-            
-            # Add SSL configuration
-            ssl_config = map_ssl_config(db_type, config)
-            pg_config.update(ssl_config)
-            
-            # Remove None values
-            pg_config = {k: v for k, v in pg_config.items() if v is not None}
-            
-            connection = psycopg2.connect(**pg_config)
+            connection = get_postgresql_pool(config).getconn()
             return connection
             
         except PostgreSQLError as e:
@@ -203,15 +457,91 @@ def create_db_connection(config: Dict[str, Any]) -> Any:
         if not MYSQL_AVAILABLE:
             print("Error: mysql-connector-python not available. Install with: pip install mysql-connector-python", file=sys.stderr)
             sys.exit(1)
+        _import_mysql()
         
         try:
-            connection = mysql.connector.connect(**config)
+            connection = get_mysql_pool(config).get_connection()
             return connection
         except MySQLError as e:
             print(f"MySQL/MariaDB connection error: {e}", file=sys.stderr)
             sys.exit(1)
 
 
+@lru_cache(maxsize=None)
+def build_pages_query(db_type: str, key_count: int = 0) -> str:
+    """Build the page query for db_type; MySQL gets one IN placeholder per space key."""
+    if db_type == 'postgresql':
+        space_filter = 'S.SPACEKEY = ANY(%s)'
+        regexp_operator = '~'
+        string_type = 'VARCHAR'
+    else:
+        # MySQL/MariaDB
+        space_filter = f"S.SPACEKEY IN ({','.join(['%s'] * key_count)})"
+        regexp_operator = 'REGEXP'
+        string_type = 'CHAR'
+    
+    # Titles are pre-filtered on the server; process_page_data still
+    # makes the final decision for every row returned. CONTENTID is
+    # cast on the server so rows arrive as ready-to-use string tuples.
+    return f"""
+        SELECT CAST(CONTENTID AS {string_type}), SPACEKEY, TITLE 
+        FROM CONTENT 
+        JOIN SPACES S ON CONTENT.SPACEID = S.SPACEID 
+        WHERE CONTENTTYPE = 'PAGE' 
+        AND PREVVER IS NULL 
+        AND CONTENT_STATUS = 'current' 
+        AND {space_filter}
+        AND (TITLE {regexp_operator} '{SQL_TITLE_PREFILTER}'
+             OR OCTET_LENGTH(TITLE) <> CHAR_LENGTH(TITLE))
+        ORDER BY CONTENTID
+        """
+
+
+def iter_prefetched(fetch: Callable[[], List[Any]], depth: int = DB_PREFETCH_BATCHES) -> Iterator[Any]:
+    """
+    Yield the items of successive fetch() batches until an empty batch.
+    
+    Batches are fetched in a background thread, at most depth ahead of the
+    consumer. Exceptions raised by fetch() are re-raised to the consumer,
+    and the thread has stopped fetching by the time this generator is closed.
+    """
+    import queue
+    import threading
+    
+    batches = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    
+    def producer() -> None:
+        try:
+            while not stop.is_set():
+                batch = fetch()
+                batches.put(batch)
+                if not batch:
+                    return
+        except BaseException as e:
+            batches.put(e)
+    
+    thread = threading.Thread(target=producer, name='pageidmap-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            batch = batches.get()
+            if isinstance(batch, BaseException):
+                raise batch
+            if not batch:
+                return
+            yield from batch
+    finally:
+        stop.set()
+        # Unblock a producer waiting on the full queue and let its current
+        # fetch finish before the caller closes the cursor
+        while thread.is_alive():
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
 def process_database_source(db_config: Dict[str, Any], space_keys: List[str]) -> Iterator[Tuple[str, str, str]]:
     """Process database-based input source with multi-database support."""
     connection = None
@@ -221,35 +551,19 @@ def process_database_source(db_config: Dict[str, Any], space_keys: List[str]) ->
     try:
         connection = create_db_connection(db_config)
         
+        # Rows are streamed in DB_FETCH_SIZE batches instead of being
+        # loaded into the client up front
         if db_type in ['postgresql', 'postgres']:
-            cursor = connection.cursor()
+            # Named cursor: results stay on the server until fetched
+            cursor = connection.cursor(name='pageidmap_stream')
+            cursor.itersize = DB_FETCH_SIZE
+            # Space keys are bound as a single array parameter
+            cursor.execute(build_pages_query('postgresql'), (list(space_keys),))
         else:
-            cursor = connection.cursor(buffered=True)
-        
-        # Build IN clause for multiple space keys
-        if db_type in ['postgresql', 'postgres']:
-            # PostgreSQL uses %s for all parameter types
-            placeholders = ','.join(['%s'] * len(space_keys))
-        else:
-            # MySQL/MariaDB
-            placeholders = ','.join(['%s'] * len(space_keys))
-        
-        query = f"""
-        SELECT CONTENTID, SPACEKEY, TITLE 
-        FROM CONTENT 
-        JOIN SPACES S ON CONTENT.SPACEID = S.SPACEID 
-        WHERE CONTENTTYPE = 'PAGE' 
-        AND PREVVER IS NULL 
-        AND CONTENT_STATUS = 'current' 
-        AND S.SPACEKEY IN ({placeholders})
-        """
-        
-        cursor.execute(query, space_keys)
+            cursor = connection.cursor(buffered=False)
+            cursor.execute(build_pages_query('mysql', len(space_keys)), space_keys)
         
-        for row in cursor:
-            content_id, db_space_key, title = row
-            page_id = str(content_id)
-            yield page_id, db_space_key, title
+        yield from iter_prefetched(lambda: cursor.fetchmany(DB_FETCH_SIZE))
         
     except (MySQLError, PostgreSQLError) as e:
         print(f"Database error: {e}", file=sys.stderr)
@@ -259,82 +573,252 @@ def process_database_source(db_config: Dict[str, Any], space_keys: List[str]) ->
         sys.exit(1)
     finally:
         if cursor:
-            cursor.close()
+            try:
+                cursor.close()
+            except (MySQLError, PostgreSQLError):
+                # Unbuffered cursors refuse to close with unread rows
+                pass
         if connection:
             if db_type in ['postgresql', 'postgres']:
-                connection.close()
-            elif hasattr(connection, 'is_connected') and connection.is_connected():
-                connection.close()
+                # Rolls back the read transaction and keeps the connection
+                get_postgresql_pool(db_config).putconn(connection)
+            else:
+                # Always hand the connection back to the pool. A stream stopped
+                # early leaves unread rows behind, which would make the next
+                # user of the connection fail, so drain them first.
+                try:
+                    connection.consume_results()
+                except MySQLError:
+                    pass
+                try:
+                    connection.close()
+                except MySQLError:
+                    # Returned to the pool even if the session reset fails
+                    pass
+
+
+def iter_mappings(pages: Iterable[Tuple[str, str, str]]) -> Iterator[Tuple[str, str]]:
+    """Yield (page_id, url) for every page that needs URL handling."""
+    if FAST_CLASSIFY_AVAILABLE:
+        # The compiled extension classifies and encodes a whole batch per call
+        pages = iter(pages)
+        while True:
+            batch = list(islice(pages, NATIVE_BATCH_SIZE))
+            if not batch:
+                return
+            yield from _fast_classify_and_format(batch)
+    
+    for page_id, space_key, title in pages:
+        url = process_page_data(space_key, title)
+        if url:
+            yield page_id, url
 
 
-def format_output_tsv(mappings: List[Dict[str, str]]) -> str:
-    """Format output as TSV."""
-    lines = []
-    for mapping in mappings:
-        lines.append(f"{mapping['page_id']}\t{mapping['url']}")
-    return '\n'.join(lines)
+def _arrow_batch_matches(titles: List[str]) -> Iterable[Tuple[int, bool]]:
+    """Return (index, is_search) for titles needing a URL, using pyarrow's RE2 kernels."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    # Assembled from raw buffers: pa.array() would import pandas (if
+    # installed) on first use, which costs more than a whole batch
+    encoded = list(map(str.encode, titles))
+    offsets = array('i', [0])
+    offsets.extend(accumulate(map(len, encoded)))
+    column = pa.StringArray.from_buffers(len(encoded), pa.py_buffer(offsets),
+                                          pa.py_buffer(b''.join(encoded)))
+    # One pass over the whole column finds every title needing a URL; the
+    # search/display split only runs on those few
+    selected = pc.indices_nonzero(pc.match_substring_regex(column, _URL_TITLE_PATTERN))
+    is_search = pc.match_substring_regex(pc.take(column, selected), SEARCH_PATTERN.pattern)
+    return zip(selected.to_pylist(), is_search.to_pylist())
+
+
+def iter_mappings_vectorized(pages: Iterable[Tuple[str, str, str]],
+                             batch_size: int = VECTORIZED_BATCH_SIZE) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (page_id, url) like iter_mappings, classifying titles in batches.
+    
+    Each batch is classified by pyarrow's C-level regex kernels over the
+    whole column, so plain titles never reach Python code; only matching
+    rows are URL-encoded. Output order is preserved.
+    """
+    pages = iter(pages)
+    while True:
+        batch = list(islice(pages, batch_size))
+        if not batch:
+            break
+        
+        for index, is_search in _arrow_batch_matches(list(map(itemgetter(2), batch))):
+            page_id, space_key, title = batch[index]
+            if is_search:
+                yield page_id, generate_search_url(title)
+            else:
+                yield page_id, generate_display_url(space_key, title)
 
 
-def format_output_csv(mappings: List[Dict[str, str]]) -> str:
-    """Format output as CSV."""
-    import csv
-    import io
+def open_output_stream() -> TextIO:
+    """Open stdout with a large write buffer, or return sys.stdout if it has no file descriptor."""
+    try:
+        fileno = sys.stdout.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return sys.stdout
     
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['page_id', 'url'])
+    sys.stdout.flush()
+    return open(fileno, 'w', buffering=OUTPUT_BUFFER_SIZE, encoding=sys.stdout.encoding,
+                errors=sys.stdout.errors, closefd=False)
+
+
+def _batch_mappings(pages: List[Tuple[str, str, str]]) -> List[Tuple[str, str]]:
+    """Worker entry point for iter_mappings_parallel."""
+    return list(iter_mappings(pages))
+
+
+def iter_mappings_parallel(pages: Iterable[Tuple[str, str, str]], workers: int,
+                           batch_size: int = PARALLEL_BATCH_SIZE) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (page_id, url) like iter_mappings, processing batches in worker processes.
     
-    for mapping in mappings:
-        writer.writerow([mapping['page_id'], mapping['url']])
+    At most two batches per worker are in flight, so memory stays bounded,
+    and results are yielded in submission order to keep output deterministic.
+    """
+    from concurrent.futures import ProcessPoolExecutor
     
-    return output.getvalue().strip()
+    pages = iter(pages)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(pending) < workers * 2:
+                batch = list(islice(pages, batch_size))
+                if not batch:
+                    break
+                pending.append(executor.submit(_batch_mappings, batch))
+            if not pending:
+                break
+            yield from pending.popleft().result()
+
+
+def iter_output_tsv(mappings: Iterable[Tuple[str, str]]) -> Iterator[str]:
+    """Yield TSV output lines as mappings are produced."""
+    for page_id, url in mappings:
+        yield f"{page_id}\t{url}"
+
+
+def _compact_json_encoder() -> Callable[[Any], str]:
+    """Return a function serializing to single-line JSON without whitespace."""
+    if ORJSON_AVAILABLE:
+        import orjson
+        dumps = orjson.dumps
+        return lambda obj: dumps(obj).decode('utf-8')
+    import json
+    return partial(json.dumps, ensure_ascii=False, separators=(',', ':'))
+
+
+def iter_output_jsonl(mappings: Iterable[Tuple[str, str]]) -> Iterator[str]:
+    """Yield JSON Lines output lines as mappings are produced."""
+    dumps = _compact_json_encoder()
+    for page_id, url in mappings:
+        yield dumps({'page_id': page_id, 'url': url})
+
+
+def format_output_tsv(mappings: List[Tuple[str, str]]) -> str:
+    """Format output as TSV."""
+    return '\n'.join(iter_output_tsv(mappings))
+
 
+def _csv_row(page_id: str, url: str) -> str:
+    """Format one CSV row without line terminator, quoted as csv.writer does."""
+    if _csv_needs_quoting(page_id) or _csv_needs_quoting(url):
+        import csv
+        
+        output = io.StringIO()
+        csv.writer(output).writerow((page_id, url))
+        return output.getvalue()[:-2]
+    # Without delimiters, quotes or line breaks no field needs quoting
+    return f"{page_id},{url}"
+
+
+def iter_output_csv(mappings: Iterable[Tuple[str, str]]) -> Iterator[str]:
+    """Yield CSV output lines as mappings are produced (joined with CRLF)."""
+    yield 'page_id,url'
+    for page_id, url in mappings:
+        yield _csv_row(page_id, url)
+
+
+def format_output_csv(mappings: List[Tuple[str, str]]) -> str:
+    """Format output as CSV."""
+    return '\r\n'.join(iter_output_csv(mappings))
 
-def format_output_json(mappings: List[Dict[str, str]]) -> str:
+
+def iter_output_json(mappings: Iterable[Tuple[str, str]]) -> Iterator[str]:
+    """Yield JSON output (a 2-space indented array) one record at a time."""
+    # json's C string encoder escapes exactly like orjson and json.dumps
+    from json.encoder import encode_basestring as encode
+    
+    mappings = iter(mappings)
+    first = next(mappings, None)
+    if first is None:
+        yield '[]'
+        return
+    
+    yield '['
+    # Each record is held back until the next one shows whether it needs a comma
+    page_id, url = first
+    record = f'  {{\n    "page_id": {encode(page_id)},\n    "url": {encode(url)}\n  }}'
+    for page_id, url in mappings:
+        yield record + ','
+        record = f'  {{\n    "page_id": {encode(page_id)},\n    "url": {encode(url)}\n  }}'
+    yield record
+    yield ']'
+
+
+def format_output_json(mappings: List[Tuple[str, str]]) -> str:
     """Format output as JSON."""
-    return json.dumps(mappings, indent=2, ensure_ascii=False)
+    return '\n'.join(iter_output_json(mappings))
 
 
-def format_output_nginx(mappings: List[Dict[str, str]], target_domain: str) -> str:
+def iter_output_nginx(mappings: Iterable[Tuple[str, str]], target_domain: str) -> Iterator[str]:
+    """Yield nginx output as mappings are produced (one two-rule block per mapping)."""
+    yield "# Nginx rewrite rules for Confluence Server/DC to Cloud migration"
+    yield f"# Target domain: {target_domain}"
+    yield ""
+    
+    # Handle different source URL patterns; both rules are emitted together
+    exact = f"$ https://{target_domain}"
+    with_params = f"&.*$ https://{target_domain}"
+    for page_id, url in mappings:
+        yield (f"{_NGINX_RULE_PREFIX}{page_id}{exact}{url}{_NGINX_RULE_SUFFIX}\n"
+               f"{_NGINX_RULE_PREFIX}{page_id}{with_params}{url}{_NGINX_RULE_SUFFIX}")
+
+
+def format_output_nginx(mappings: List[Tuple[str, str]], target_domain: str) -> str:
     """Format output as nginx rewrite rules."""
-    lines = []
-    lines.append("# Nginx rewrite rules for Confluence Server/DC to Cloud migration")
-    lines.append(f"# Target domain: {target_domain}")
-    lines.append("")
-    
-    for mapping in mappings:
-        page_id = mapping['page_id']
-        url = mapping['url']
-        
-        # Handle different source URL patterns
-        lines.append(f"rewrite ^/pages/viewpage\\.action\\?pageId={page_id}$ https://{target_domain}{url} permanent;")
-        lines.append(f"rewrite ^/pages/viewpage\\.action\\?pageId={page_id}&.*$ https://{target_domain}{url} permanent;")
+    return '\n'.join(iter_output_nginx(mappings, target_domain))
+
+
+def iter_output_apache(mappings: Iterable[Tuple[str, str]], target_domain: str) -> Iterator[str]:
+    """Yield Apache output as mappings are produced (one two-rule block per mapping)."""
+    yield "# Apache rewrite rules for Confluence Server/DC to Cloud migration"
+    yield f"# Target domain: {target_domain}"
+    yield "# Add these rules to your Apache configuration or .htaccess"
+    yield "RewriteEngine On"
+    yield ""
     
-    return '\n'.join(lines)
+    # Handle pageId URLs with and without additional parameters
+    exact = f"$ https://{target_domain}"
+    with_params = f"&.*$ https://{target_domain}"
+    for page_id, url in mappings:
+        yield (f"{_APACHE_RULE_PREFIX}{page_id}{exact}{url}{_APACHE_RULE_SUFFIX}\n"
+               f"{_APACHE_RULE_PREFIX}{page_id}{with_params}{url}{_APACHE_RULE_SUFFIX}")
 
 
-def format_output_apache(mappings: List[Dict[str, str]], target_domain: str) -> str:
+def format_output_apache(mappings: List[Tuple[str, str]], target_domain: str) -> str:
     """Format output as Apache rewrite rules."""
-    lines = []
-    lines.append("# Apache rewrite rules for Confluence Server/DC to Cloud migration")
-    lines.append(f"# Target domain: {target_domain}")
-    lines.append("# Add these rules to your Apache configuration or .htaccess")
-    lines.append("RewriteEngine On")
-    lines.append("")
-    
-    for mapping in mappings:
-        page_id = mapping['page_id']
-        url = mapping['url']
-        
-        # Handle pageId URLs with and without additional parameters
-        lines.append(f"RewriteRule ^pages/viewpage\\.action\\?pageId={page_id}$ https://{target_domain}{url} [R=301,L]")
-        lines.append(f"RewriteRule ^pages/viewpage\\.action\\?pageId={page_id}&.*$ https://{target_domain}{url} [R=301,L]")
-    
-    return '\n'.join(lines)
+    return '\n'.join(iter_output_apache(mappings, target_domain))
 
 
-def output_results(mappings: List[Dict[str, str]], output_format: str, silent: bool, target_domain: str = None) -> None:
-    """Output results in specified format."""
+def output_results(mappings: List[Tuple[str, str]], output_format: str, silent: bool, target_domain: str = None,
+                   out: Optional[TextIO] = None) -> None:
+    """Output results in specified format to out (default stdout)."""
     if not mappings and not silent:
         print("No URL mappings generated", file=sys.stderr)
         return
@@ -359,7 +843,65 @@ def output_results(mappings: List[Dict[str, str]], output_format: str, silent: b
     if silent and not result:
         sys.exit(0)
     
-    print(result)
+    out = out or sys.stdout
+    out.write(result)
+    out.write('\n')
+
+
+def stream_results(mappings: Iterable[Tuple[str, str]], output_format: str, silent: bool,
+                   target_domain: str = None, out: Optional[TextIO] = None) -> int:
+    """
+    Write results to out (default stdout) as mappings are produced.
+    
+    The output is identical to output_results() for the same mappings, but
+    only up to OUTPUT_BATCH_LINES lines are held in memory; they are joined
+    into a single write() per batch. Returns the mapping count.
+    """
+    mappings = iter(mappings)
+    first = next(mappings, None)
+    if first is None:
+        output_results([], output_format, silent, target_domain, out)
+        return 0
+    
+    if output_format in ('nginx', 'apache') and not target_domain:
+        print(f"Error: --target-domain required for {output_format} format", file=sys.stderr)
+        sys.exit(1)
+    
+    count = 0
+    
+    def counted() -> Iterator[Tuple[str, str]]:
+        nonlocal count
+        for mapping in chain((first,), mappings):
+            count += 1
+            yield mapping
+    
+    separator = '\n'
+    if output_format == 'json':
+        lines = iter_output_json(counted())
+    elif output_format == 'csv':
+        lines = iter_output_csv(counted())
+        separator = '\r\n'
+    elif output_format == 'jsonl':
+        lines = iter_output_jsonl(counted())
+    elif output_format == 'nginx':
+        lines = iter_output_nginx(counted(), target_domain)
+    elif output_format == 'apache':
+        lines = iter_output_apache(counted(), target_domain)
+    else:  # tsv (default)
+        lines = iter_output_tsv(counted())
+    
+    # Same layout as output_results: lines joined by separator, then a newline.
+    # Lines are joined in batches so each write() call carries many of them.
+    write = (out or sys.stdout).write
+    write(next(lines))
+    while True:
+        batch = list(islice(lines, OUTPUT_BATCH_LINES))
+        if not batch:
+            break
+        write(separator)
+        write(separator.join(batch))
+    write('\n')
+    return count
 
 
 def parse_database_string(db_string: str) -> Dict[str, Any]:
@@ -434,12 +976,61 @@ def get_database_credentials() -> Tuple[str, str]:
     return username, password
 
 
+def read_toml_config(config_path: str) -> Dict[str, Dict[str, str]]:
+    """Read a TOML configuration file into configparser's section layout."""
+    try:
+        import tomllib  # Python 3.11+
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            print("Error: TOML configuration files require Python 3.11+ or tomli. "
+                  "Install with: pip install tomli", file=sys.stderr)
+            sys.exit(1)
+    
+    try:
+        with open(config_path, 'rb') as f:
+            raw = tomllib.load(f)
+    except FileNotFoundError:
+        # Same as ConfigParser.read(): a missing file is an empty config
+        return {}
+    
+    sections = {}
+    for name, values in raw.items():
+        if not isinstance(values, dict):
+            continue
+        sections[name] = {
+            key: ','.join(map(str, value)) if isinstance(value, list) else str(value)
+            for key, value in values.items()
+        }
+    return sections
+
+
 def load_config_file(config_path: str) -> Dict[str, Any]:
-    """Load configuration from file."""
-    config = configparser.ConfigParser()
+    """Load configuration from file (cached per path and modification time)."""
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    # Callers may modify the result, so never hand out the cached dict itself
+    return copy.deepcopy(_load_config_file_cached(config_path, mtime))
+
+
+@lru_cache(maxsize=8)
+def _load_config_file_cached(config_path: str, mtime: Optional[int]) -> Dict[str, Any]:
+    """Parse configuration file; mtime is only part of the cache key."""
+    # Imported here so runs without -c do not pay for it
+    import configparser
+    
+    # TOML values are literal strings, so no %-interpolation for them
+    is_toml = config_path.endswith('.toml')
+    config = configparser.ConfigParser(interpolation=None if is_toml else configparser.BasicInterpolation())
     
     try:
-        config.read(config_path)
+        if is_toml:
+            config.read_dict(read_toml_config(config_path))
+        else:
+            config.read(config_path)
         
         result = {}
         
@@ -454,7 +1045,8 @@ def load_config_file(config_path: str) -> Dict[str, Any]:
                 'user': db_section.get('user', ''),
                 'password': db_section.get('password', ''),
                 'charset': db_section.get('charset', 'utf8mb4'),
-                'collation': db_section.get('collation', 'utf8mb4_unicode_ci')
+                'collation': db_section.get('collation', 'utf8mb4_unicode_ci'),
+                'pool_size': db_section.getint('pool_size', DB_POOL_SIZE)
             }
             
             # Set default port based on database type if not specified
@@ -484,7 +1076,7 @@ def load_config_file(config_path: str) -> Dict[str, Any]:
         if 'processing' in config:
             proc_section = config['processing']
             result['processing'] = {
-                'default_spaces': proc_section.get('default_spaces', 'INFO').split(','),
+                'default_spaces': parse_space_keys(proc_section.get('default_spaces', 'INFO')),
                 'output_format': proc_section.get('output_format', 'tsv'),
                 'target_domain': proc_section.get('target_domain', ''),
                 'silent': proc_section.getboolean('silent', False)
@@ -513,6 +1105,8 @@ host = localhost
 database = confluence
 user = confluence_user
 password = 
+# Database connection pool size (MySQL/MariaDB opens these connections up front)
+pool_size = 1
 
 # SSL/TLS settings (optional)
 ssl_enabled = false
@@ -533,7 +1127,7 @@ ssl_key = /path/to/client-key.pem
 [processing]
 # Default space keys (comma-separated)
 default_spaces = INFO,DOCS
-# Default output format: tsv, csv, json, nginx, apache
+# Default output format: tsv, csv, json, jsonl, nginx, apache
 output_format = tsv
 # Target domain for nginx/apache rewrites (required for nginx/apache formats)
 target_domain = company.atlassian.net
@@ -607,12 +1201,12 @@ def main() -> None:
     # Processing options
     parser.add_argument(
         '-s', '--spaces',
-        default='INFO',
-        help='Space keys to filter (comma-separated, default: INFO)'
+        help='Space keys to filter (comma-separated, default: default_spaces from config file, or INFO; '
+             'file input is only filtered when given)'
     )
     parser.add_argument(
         '--output-format',
-        choices=['tsv', 'csv', 'json', 'nginx', 'apache'],
+        choices=['tsv', 'csv', 'json', 'jsonl', 'nginx', 'apache'],
         default='tsv',
         help='Output format (default: tsv)'
     )
@@ -626,6 +1220,18 @@ def main() -> None:
         action='store_true',
         help='Silent mode (requires output format)'
     )
+    parser.add_argument(
+        '--vectorized',
+        action='store_true',
+        help='Classify pages in batches with pyarrow regex kernels (requires pyarrow; not faster than the default)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Number of worker processes for page processing (default: 1)'
+    )
     
     # SSL options
     parser.add_argument(
@@ -669,6 +1275,16 @@ def main() -> None:
         print("Error: Silent mode requires --output-format", file=sys.stderr)
         sys.exit(1)
     
+    if args.workers < 1:
+        print("Error: --workers must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    if args.workers > 1 and args.vectorized:
+        print("Error: --vectorized cannot be combined with --workers", file=sys.stderr)
+        sys.exit(1)
+    if args.vectorized and not PYARROW_AVAILABLE:
+        print("Error: pyarrow not available. Install with: pip install pyarrow", file=sys.stderr)
+        sys.exit(1)
+    
     # Load configuration
     config_data = {}
     if args.config:
@@ -680,19 +1296,20 @@ def main() -> None:
               file=sys.stderr)
         sys.exit(1)
     
-    mappings = []
-    
+    pages = None
     try:
         if args.file:
             # File-based processing
+            # Space keys only filter file input when given explicitly
+            space_keys = parse_space_keys(args.spaces) if args.spaces else []
+            space_filter = frozenset(space_keys) if space_keys else None
+            
             if args.verbose and not args.silent:
                 print(f"Processing file: {args.file}", file=sys.stderr)
+                if space_keys:
+                    print(f"Filtering spaces: {', '.join(space_keys)}", file=sys.stderr)
             
-            for page_id, space_key, title in process_file_source(args.file, args.silent):
-                result = process_page_data(page_id, space_key, title)
-                if result:
-                    url = result.split('\t', 1)[1]  # Extract URL part
-                    mappings.append({'page_id': page_id, 'url': url})
+            pages = process_file_source(args.file, args.silent, space_filter)
         
         else:
             # Database-based processing
@@ -712,21 +1329,18 @@ def main() -> None:
             # Setup SSL from arguments
             setup_ssl_config(db_config, args)
             
-            # Parse space keys
-            space_keys = parse_space_keys(args.spaces)
-            if not space_keys and config_data.get('processing', {}).get('default_spaces'):
-                space_keys = config_data['processing']['default_spaces']
+            # Parse space keys; configured default_spaces (already
+            # normalized) apply only when -s is not given
+            space_keys = parse_space_keys(args.spaces) if args.spaces else []
+            if not space_keys:
+                space_keys = config_data.get('processing', {}).get('default_spaces') or ['INFO']
             
             if args.verbose and not args.silent:
                 print(f"Connecting to database: {db_config['host']}:{db_config['port']}/{db_config['database']}", 
                       file=sys.stderr)
                 print(f"Querying spaces: {', '.join(space_keys)}", file=sys.stderr)
             
-            for page_id, space_key, title in process_database_source(db_config, space_keys):
-                result = process_page_data(page_id, space_key, title)
-                if result:
-                    url = result.split('\t', 1)[1]  # Extract URL part
-                    mappings.append({'page_id': page_id, 'url': url})
+            pages = process_database_source(db_config, space_keys)
         
         # Determine output format and target domain
         output_format = args.output_format
@@ -741,11 +1355,37 @@ def main() -> None:
         silent = args.silent or config_data.get('processing', {}).get('silent', False)
         
         # Output results
-        output_results(mappings, output_format, silent, target_domain)
+        if args.workers > 1:
+            page_mappings = iter_mappings_parallel(pages, args.workers)
+        elif args.vectorized:
+            page_mappings = iter_mappings_vectorized(pages)
+        else:
+            page_mappings = iter_mappings(pages)
+        
+        out = open_output_stream()
+        try:
+            # Lines are written as soon as each page is processed
+            count = stream_results(page_mappings, output_format, silent, target_domain, out)
+        finally:
+            out.flush()
         
         if args.verbose and not silent:
-            print(f"Generated {len(mappings)} URL mappings", file=sys.stderr)
+            print(f"Generated {count} URL mappings", file=sys.stderr)
+            search_info = _encoded_title.cache_info()
+            display_info = _encoded_display_title.cache_info()
+            hits = search_info.hits + display_info.hits
+            misses = search_info.misses + display_info.misses
+            # The compiled extension and --workers children encode titles
+            # without these in-process caches
+            if hits or misses:
+                print(f"Title encoding cache: {hits} hits, {misses} misses", file=sys.stderr)
     
+    except BrokenPipeError:
+        # Output consumer went away (e.g. piped into head); send anything
+        # still buffered to devnull so the interpreter exits quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
     except KeyboardInterrupt:
         if not args.silent:
             print("\nOperation cancelled by user", file=sys.stderr)
@@ -754,6 +1394,12 @@ def main() -> None:
         if not args.silent:
             print(f"Fatal error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        # A stream stopped early must hand its connection back before the
+        # pools are closed
+        if pages is not None:
+            pages.close()
+        close_db_pools()
 
 
 if __name__ == '__main__':